@@ -0,0 +1,21 @@
+import logging
+import asyncio
+from iqoptionapi.api import IQOptionAPI
+from cachetools import TTLCache
+from json_utils import response_json
+
+logger = logging.getLogger(__name__)
+
+_profile_cache = TTLCache(maxsize=1, ttl=5)
+
+async def get_profile(client: IQOptionAPI) -> dict:
+    profile = _profile_cache.get('profile')
+    if profile is None:
+        response = await asyncio.get_running_loop().run_in_executor(None, client.getprofile)
+        profile = response_json(response)['result']
+        _profile_cache['profile'] = profile
+    return profile
+
+def invalidate_profile():
+    _profile_cache.clear()
+    logger.debug("Profile cache invalidated.")
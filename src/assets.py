@@ -1,43 +1,50 @@
 import logging
 import asyncio
 import time
+from operator import itemgetter
+import numpy as np
 from iqoptionapi.api import IQOptionAPI
 from settings import (
     TIMEFRAME, MIN_PAYOUT, ASSETS, SORT_BY, SORT_ORDER,
     RSI_BUY_THRESHOLD, RSI_SELL_THRESHOLD, MACD_INDICATOR,
     INDICATOR_TIMEOUT, STOCHASTIC_BUY_THRESHOLD, STOCHASTIC_SELL_THRESHOLD
 )
-from indicators import calculate_indicators
+from indicators import calculate_indicators, get_latest_price
+from account import get_profile
+from json_utils import response_json
 
 logger = logging.getLogger(__name__)
 
-def extract_price(price_data):
-    if isinstance(price_data, dict) and 'close' in price_data:
-        return float(price_data['close'])
-    return None
-
-async def get_realtime_prices(client: IQOptionAPI, assets: list) -> dict:
-    prices = {}
-    if not assets:
-        return prices
-
-    semaphore = asyncio.Semaphore(10)
-    async def fetch_price(asset):
-        async with semaphore:
-            try:
-                client.subscribe(asset, int(TIMEFRAME.replace('M', '')))
-                await asyncio.sleep(1)  # Aguarda dados do WebSocket
-                data = client.candles.get_realtime_candles(asset, int(TIMEFRAME.replace('M', '')))
-                price = extract_price(list(data.values())[-1] if data else None)
-                if isinstance(price, (int, float)):
-                    prices[asset] = price
-                else:
-                    logger.debug(f"No numeric price for {asset}: {data}")
-            except Exception as e:
-                logger.warning(f"Failed to fetch price for {asset}: {e}")
-
-    await asyncio.gather(*(fetch_price(asset) for asset in assets))
-    return prices
+def _as_float(value):
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+def _indicator_column(indicators: dict, assets: list, name: str, field: str = None) -> np.ndarray:
+    def value(asset):
+        v = indicators.get(asset, {}).get(name)
+        if field is not None:
+            v = v.get(field) if isinstance(v, dict) else None
+        return _as_float(v)
+    return np.fromiter((value(a) for a in assets), dtype=np.float64, count=len(assets))
+
+def _build_signal_fn(macd_on: bool):
+    def base_signals(price, rsi, stoch_k, bb_lower, bb_upper):
+        buy = (rsi < RSI_BUY_THRESHOLD) & (stoch_k < STOCHASTIC_BUY_THRESHOLD) & \
+              (np.isnan(bb_lower) | (price > bb_lower))
+        sell = (rsi > RSI_SELL_THRESHOLD) & (stoch_k > STOCHASTIC_SELL_THRESHOLD) & \
+               (np.isnan(bb_upper) | (price < bb_upper))
+        return buy, sell
+
+    if not macd_on:
+        def signal_fn(price, rsi, stoch_k, macd, signal, bb_lower, bb_upper):
+            return base_signals(price, rsi, stoch_k, bb_lower, bb_upper)
+        return signal_fn
+
+    def signal_fn(price, rsi, stoch_k, macd, signal, bb_lower, bb_upper):
+        buy, sell = base_signals(price, rsi, stoch_k, bb_lower, bb_upper)
+        return buy & (macd > signal), sell & (macd < signal)
+    return signal_fn
+
+_SIGNAL_FN = _build_signal_fn(MACD_INDICATOR)
 
 async def list_open_otc_assets(client: IQOptionAPI):
     timeframe = TIMEFRAME if TIMEFRAME in ('1M', '5M') else '1M'
@@ -45,7 +52,7 @@ async def list_open_otc_assets(client: IQOptionAPI):
     sort_order = SORT_ORDER if SORT_ORDER in ('asc', 'desc') else 'desc'
 
     try:
-        open_assets = client.getprofile().json()['result']['binary']['open']
+        open_assets = (await get_profile(client))['binary']['open']
         otc_names = [name for name, is_open in open_assets.items() if name.endswith('-OTC') and is_open]
     except Exception as e:
         logger.error(f"Error fetching open assets: {e}")
@@ -56,66 +63,72 @@ async def list_open_otc_assets(client: IQOptionAPI):
         otc_names = [a for a in selected if a in otc_names]
         logger.info(f"Assets filter applied: {selected}, remaining: {otc_names}")
 
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(10)
+    async def fetch_payout(asset):
+        async with semaphore:
+            try:
+                payout_data = response_json(await loop.run_in_executor(None, client.billing, asset))
+                return payout_data['result']['payout'] if payout_data.get('result') else 0
+            except Exception as e:
+                logger.warning(f"Payout fetch error for {asset}: {e}")
+                return None
+
+    payouts = await asyncio.gather(*(fetch_payout(asset) for asset in otc_names))
     candidates = []
-    for asset in otc_names:
-        try:
-            payout_response = client.billing(asset)
-            payout = payout_response.json()['result']['payout'] if payout_response.json().get('result') else 0
-            if isinstance(payout, (int, float)) and payout >= MIN_PAYOUT:
-                candidates.append((asset, payout))
-            else:
-                logger.debug(f"Skipping {asset}: Payout {payout} below minimum {MIN_PAYOUT}%")
-        except Exception as e:
-            logger.warning(f"Payout fetch error for {asset}: {e}")
+    for asset, payout in zip(otc_names, payouts):
+        if payout is None:
+            continue
+        if isinstance(payout, (int, float)) and payout >= MIN_PAYOUT:
+            candidates.append((asset, payout))
+        else:
+            logger.debug(f"Skipping {asset}: Payout {payout} below minimum {MIN_PAYOUT}%")
 
     if not candidates:
         logger.info("No open OTC assets meet the minimum payout criteria.")
         return []
 
     assets_list = [a for a, _ in candidates]
-    prices = await get_realtime_prices(client, assets_list)
     indicators = await asyncio.wait_for(calculate_indicators(client, assets_list), timeout=INDICATOR_TIMEOUT)
-
-    tradable = []
-    discard_counts = {'price_invalid': 0, 'missing_indicators': 0, 'invalid_stochastic': 0, 'no_signal': 0}
-
-    for asset, payout in candidates:
-        vals = indicators.get(asset, {})
-        rsi = vals.get("RSI")
-        sma = vals.get("SMA")
-        stoch_k = vals.get("STOCHASTIC", {}).get("k")
-        stoch_d = vals.get("STOCHASTIC", {}).get("d")
-        macd = vals.get("MACD", {}).get("macd")
-        signal = vals.get("MACD", {}).get("signal")
-        bb_upper = vals.get("BB_upper")
-        bb_lower = vals.get("BB_lower")
-        price = prices.get(asset)
-
-        if price is None or price < 0.0001:
-            logger.warning(f"Skipping {asset}: Invalid price ({price})")
-            discard_counts['price_invalid'] += 1
-            continue
-        if rsi is None or sma is None:
-            logger.warning(f"Skipping {asset}: Missing indicators")
-            discard_counts['missing_indicators'] += 1
-            continue
-        if stoch_k is None or stoch_d is None:
-            logger.warning(f"Skipping {asset}: Invalid Stochastic")
-            discard_counts['invalid_stochastic'] += 1
-            continue
-
-        buy = rsi < RSI_BUY_THRESHOLD and stoch_k < STOCHASTIC_BUY_THRESHOLD and \
-              (not MACD_INDICATOR or (macd is not None and signal is not None and macd > signal)) and \
-              (bb_lower is None or price > bb_lower)
-        sell = rsi > RSI_SELL_THRESHOLD and stoch_k > STOCHASTIC_SELL_THRESHOLD and \
-               (not MACD_INDICATOR or (macd is not None and signal is not None and macd < signal)) and \
-               (bb_upper is None or price < bb_upper)
-        if buy or sell:
-            tradable.append((asset, payout))
-        else:
-            discard_counts['no_signal'] += 1
+    prices = {a: get_latest_price(a) for a in assets_list}
+
+    n = len(assets_list)
+    arr_price = np.fromiter((_as_float(prices.get(a)) for a in assets_list), dtype=np.float64, count=n)
+    arr_rsi = _indicator_column(indicators, assets_list, "RSI")
+    arr_sma = _indicator_column(indicators, assets_list, "SMA")
+    arr_stoch_k = _indicator_column(indicators, assets_list, "STOCHASTIC", "k")
+    arr_stoch_d = _indicator_column(indicators, assets_list, "STOCHASTIC", "d")
+    arr_macd = _indicator_column(indicators, assets_list, "MACD", "macd")
+    arr_signal = _indicator_column(indicators, assets_list, "MACD", "signal")
+    arr_bb_upper = _indicator_column(indicators, assets_list, "BB_upper")
+    arr_bb_lower = _indicator_column(indicators, assets_list, "BB_lower")
+
+    price_ok = arr_price >= 0.0001
+    indicators_ok = price_ok & ~np.isnan(arr_rsi) & ~np.isnan(arr_sma)
+    valid_mask = indicators_ok & ~np.isnan(arr_stoch_k) & ~np.isnan(arr_stoch_d)
+
+    for i in np.where(~price_ok)[0]:
+        logger.warning(f"Skipping {assets_list[i]}: Invalid price ({prices.get(assets_list[i])})")
+    for i in np.where(price_ok & ~indicators_ok)[0]:
+        logger.warning(f"Skipping {assets_list[i]}: Missing indicators")
+    for i in np.where(indicators_ok & ~valid_mask)[0]:
+        logger.warning(f"Skipping {assets_list[i]}: Invalid Stochastic")
+
+    buy_mask, sell_mask = _SIGNAL_FN(arr_price, arr_rsi, arr_stoch_k, arr_macd, arr_signal, arr_bb_lower, arr_bb_upper)
+    buy_mask &= valid_mask
+    sell_mask &= valid_mask
+    signal_mask = buy_mask | sell_mask
+
+    tradable = [candidates[i] for i in np.where(signal_mask)[0]]
+    discard_counts = {
+        'price_invalid': int((~price_ok).sum()),
+        'missing_indicators': int((price_ok & ~indicators_ok).sum()),
+        'invalid_stochastic': int((indicators_ok & ~valid_mask).sum()),
+        'no_signal': int((valid_mask & ~signal_mask).sum())
+    }
 
     logger.info(f"Discard summary: {discard_counts}")
-    tradable.sort(key=lambda x: x[1] if sort_by == 'payout' else prices.get(x[0], 0), reverse=(sort_order == 'desc'))
+    sort_key = itemgetter(1) if sort_by == 'payout' else lambda x: prices.get(x[0], 0)
+    tradable.sort(key=sort_key, reverse=(sort_order == 'desc'))
     logger.info(f"Tradable assets: {tradable}")
     return tradable
\ No newline at end of file
@@ -1,7 +1,7 @@
 import logging
 import asyncio
 import time
-import talib
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from iqoptionapi.api import IQOptionAPI
 from settings import (
@@ -12,15 +12,54 @@ from settings import (
     MACD_INDICATOR, MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD
 )
 from cachetools import TTLCache
+from indicators_numba import compute_batch, warm_up
+from json_utils import response_json
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 logger = logging.getLogger(__name__)
 
-def get_indicator_cache(timeframe: int):
-    ttl = timeframe * 5
-    return TTLCache(maxsize=100, ttl=ttl)
+BOLLINGER_PERIOD = 50
+BOLLINGER_DEVIATION = 2
 
-candle_cache = TTLCache(maxsize=100, ttl=300)
+def _cache_ttl(timeframe: int) -> int:
+    return max(15, timeframe // 2)
+
+_candle_caches: dict[int, TTLCache] = {}
+_price_caches: dict[int, TTLCache] = {}
+_indicator_caches: dict[int, TTLCache] = {}
+
+def get_candle_cache(timeframe: int) -> TTLCache:
+    if timeframe not in _candle_caches:
+        _candle_caches[timeframe] = TTLCache(maxsize=200, ttl=_cache_ttl(timeframe))
+    return _candle_caches[timeframe]
+
+def get_price_cache(timeframe: int) -> TTLCache:
+    if timeframe not in _price_caches:
+        _price_caches[timeframe] = TTLCache(maxsize=200, ttl=_cache_ttl(timeframe))
+    return _price_caches[timeframe]
+
+def get_latest_price(asset: str, timeframe: int = 60):
+    return get_price_cache(timeframe).get(asset)
+
+def get_indicator_cache(timeframe: int) -> TTLCache:
+    if timeframe not in _indicator_caches:
+        _indicator_caches[timeframe] = TTLCache(maxsize=100, ttl=_cache_ttl(timeframe))
+    return _indicator_caches[timeframe]
+
+# The batch kernel parallelises internally; one worker keeps a single parallel region active.
+_compute_pool = ThreadPoolExecutor(max_workers=1)
+
+CANDLE_DTYPE = np.dtype([('close', 'f8'), ('high', 'f8'), ('low', 'f8')])
+
+def candles_to_array(candles: list) -> np.ndarray:
+    return np.fromiter(
+        ((float(c['close']), float(c['max']), float(c['min'])) for c in candles),
+        dtype=CANDLE_DTYPE, count=len(candles)
+    )
+
+def _download_candles(client: IQOptionAPI, asset: str, timeframe: int, history_size: int) -> np.ndarray:
+    response = client.getcandles(asset, timeframe, history_size)
+    return candles_to_array(response_json(response).get('data') or [])
 
 @retry(
     stop=stop_after_attempt(5),
@@ -29,99 +68,102 @@ candle_cache = TTLCache(maxsize=100, ttl=300)
 )
 async def get_candles_with_retry(client: IQOptionAPI, asset: str, timeframe: int, history_size: int):
     try:
-        response = client.getcandles(asset, timeframe, history_size)
-        candles = response.json()['data'] if response.json().get('data') else []
-        return candles
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _download_candles, client, asset, timeframe, history_size)
     except Exception as e:
         logger.warning(f"Failed to fetch candles for {asset}: {e}. Retrying...")
         raise
 
+def _compute_batch_values(candles_list: list) -> list:
+    return compute_batch(
+        [(candles['close'], candles['high'], candles['low']) for candles in candles_list],
+        RSI_PERIOD, SMA_PERIOD, EMA_PERIOD,
+        STOCHASTIC_K_PERIOD, STOCHASTIC_D_PERIOD,
+        MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD,
+        BOLLINGER_PERIOD, BOLLINGER_DEVIATION
+    )
+
+async def warm_up_indicators():
+    start = time.time()
+    await asyncio.get_running_loop().run_in_executor(_compute_pool, warm_up)
+    logger.debug(f"Indicator kernels compiled in {time.time() - start:.2f} seconds.")
+
 async def calculate_indicators(client: IQOptionAPI, assets: list, timeframe: int = 60) -> dict:
     if not assets:
         logger.debug("No assets provided. Returning empty dictionary.")
         return {}
 
     indicator_cache = get_indicator_cache(timeframe)
-    cache_key = f"{timeframe}_{','.join(sorted(assets))}"
-    if cache_key in indicator_cache:
+    price_cache = get_price_cache(timeframe)
+    cache_key = (timeframe, frozenset(assets))
+    if cache_key in indicator_cache and all(asset in price_cache for asset in assets):
         logger.debug(f"Returning cached indicators for key: {cache_key}")
         return indicator_cache[cache_key]
 
     indicators_config = []
     if RSI_INDICATOR:
-        indicators_config.append(('RSI', {'period': RSI_PERIOD}, RSI_MIN, RSI_MAX, RSI_PERIOD))
+        indicators_config.append(('RSI', 'rsi', RSI_MIN, RSI_MAX, RSI_PERIOD))
     if SMA_INDICATOR:
-        indicators_config.append(('SMA', {'period': SMA_PERIOD}, SMA_MIN, SMA_MAX, SMA_PERIOD))
+        indicators_config.append(('SMA', 'sma', SMA_MIN, SMA_MAX, SMA_PERIOD))
     if EMA_INDICATOR:
-        indicators_config.append(('EMA', {'period': EMA_PERIOD}, EMA_MIN, EMA_MAX, EMA_PERIOD))
+        indicators_config.append(('EMA', 'ema', EMA_MIN, EMA_MAX, EMA_PERIOD))
     if STOCHASTIC_INDICATOR:
-        indicators_config.append(('STOCHASTIC', {'k_period': STOCHASTIC_K_PERIOD, 'd_period': STOCHASTIC_D_PERIOD}, float('-inf'), float('inf'), STOCHASTIC_K_PERIOD))
+        indicators_config.append(('STOCHASTIC', {'k': 'stoch_k', 'd': 'stoch_d'}, float('-inf'), float('inf'), STOCHASTIC_K_PERIOD))
     if MACD_INDICATOR:
-        indicators_config.append(('MACD', {'fast_period': MACD_FAST_PERIOD, 'slow_period': MACD_SLOW_PERIOD, 'signal_period': MACD_SIGNAL_PERIOD}, float('-inf'), float('inf'), MACD_SLOW_PERIOD))
-    indicators_config.append(('BOLLINGER', {'period': 50, 'deviation': 2}, float('-inf'), float('inf'), 50))
+        indicators_config.append(('MACD', {'macd': 'macd', 'signal': 'macd_signal'}, float('-inf'), float('inf'), MACD_SLOW_PERIOD))
+    indicators_config.append(('BOLLINGER', {'BB_upper': 'bb_upper', 'BB_lower': 'bb_lower'}, float('-inf'), float('inf'), BOLLINGER_PERIOD))
 
     if not indicators_config:
         logger.warning("No indicators enabled. Returning empty results.")
         return {asset: {} for asset in assets}
 
     results = {asset: {} for asset in assets}
+    candle_cache = get_candle_cache(timeframe)
     semaphore = asyncio.Semaphore(5)
-
-    for asset in assets:
-        try:
-            max_period = max(period for _, _, _, _, period in indicators_config)
-            history_size = max(1800, timeframe * (max_period * 3))
-            cache_key_candles = f"{asset}_{timeframe}_{history_size}"
-            if cache_key_candles in candle_cache:
-                candles = candle_cache[cache_key_candles]
-            else:
+    max_period = max(period for _, _, _, _, period in indicators_config)
+    history_size = max(1800, timeframe * (max_period * 3))
+
+    async def fetch_candles(asset):
+        cache_key_candles = f"{asset}_{timeframe}_{history_size}"
+        if cache_key_candles in candle_cache:
+            candles = candle_cache[cache_key_candles]
+        else:
+            async with semaphore:
                 candles = await get_candles_with_retry(client, asset, timeframe, history_size)
-                candle_cache[cache_key_candles] = candles
+            candle_cache[cache_key_candles] = candles
+        if len(candles):
+            price_cache[asset] = float(candles['close'][-1])
+        return candles
 
-            if not candles or len(candles) < max_period:
-                logger.warning(f"Insufficient candle data for {asset}. Skipping.")
-                continue
+    fetched = await asyncio.gather(*(fetch_candles(asset) for asset in assets), return_exceptions=True)
 
-            closes = np.array([float(candle['close']) for candle in candles])
-            highs = np.array([float(candle['max']) for candle in candles])
-            lows = np.array([float(candle['min']) for candle in candles])
+    ready = []
+    for asset, candles in zip(assets, fetched):
+        if isinstance(candles, BaseException):
+            logger.error(f"Error processing data for {asset}: {candles}")
+        elif len(candles) < max_period:
+            logger.warning(f"Insufficient candle data for {asset}. Skipping.")
+        else:
+            ready.append((asset, candles))
 
-            async with semaphore:
-                for indicator_name, params, min_val, max_val, period in indicators_config:
-                    try:
-                        if indicator_name == 'RSI':
-                            value = talib.RSI(closes, timeperiod=params['period'])[-1]
-                        elif indicator_name == 'SMA':
-                            value = talib.SMA(closes, timeperiod=params['period'])[-1]
-                        elif indicator_name == 'EMA':
-                            value = talib.EMA(closes, timeperiod=params['period'])[-1]
-                        elif indicator_name == 'STOCHASTIC':
-                            k, d = talib.STOCH(highs, lows, closes, fastk_period=params['k_period'], slowd_period=params['d_period'])
-                            value = {'k': k[-1], 'd': d[-1]}
-                        elif indicator_name == 'MACD':
-                            macd, signal, _ = talib.MACD(closes, fastperiod=params['fast_period'], slowperiod=params['slow_period'], signalperiod=params['signal_period'])
-                            value = {'macd': macd[-1], 'signal': signal[-1]}
-                        elif indicator_name == 'BOLLINGER':
-                            upper, middle, lower = talib.BBANDS(closes, timeperiod=params['period'], nbdevup=params['deviation'], nbdevdn=params['deviation'])
-                            value = {'BB_upper': upper[-1], 'BB_lower': lower[-1]}
-
-                        if isinstance(value, dict):
-                            if all(v is not None and isinstance(v, (int, float)) for v in value.values()):
-                                results[asset][indicator_name] = value
-                            else:
-                                results[asset][indicator_name] = None
-                        else:
-                            if isinstance(value, (int, float)) and min_val <= value <= max_val:
-                                results[asset][indicator_name] = value
-                            else:
-                                results[asset][indicator_name] = None
-
-                    except Exception as e:
-                        logger.error(f"Error calculating {indicator_name} for {asset}: {e}")
-                        results[asset][indicator_name] = None
-
-        except Exception as e:
-            logger.error(f"Error processing data for {asset}: {e}")
+    try:
+        loop = asyncio.get_running_loop()
+        computed = await loop.run_in_executor(_compute_pool, _compute_batch_values, [candles for _, candles in ready])
+    except Exception as e:
+        logger.error(f"Error computing indicators for {[asset for asset, _ in ready]}: {e}")
+        computed = []
+
+    for (asset, _), last in zip(ready, computed):
+        for indicator_name, fields, min_val, max_val, _ in indicators_config:
+            if isinstance(fields, dict):
+                results[asset][indicator_name] = {key: getattr(last, field) for key, field in fields.items()}
+            else:
+                value = getattr(last, fields)
+                results[asset][indicator_name] = value if min_val <= value <= max_val else None
+
+    if any(isinstance(candles, BaseException) for candles in fetched) or len(computed) != len(ready):
+        logger.debug(f"Not caching incomplete indicators for key: {cache_key}")
+        return results
 
     indicator_cache[cache_key] = results
     logger.debug(f"Cached indicators for key: {cache_key}")
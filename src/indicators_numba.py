@@ -0,0 +1,182 @@
+import math
+from typing import NamedTuple
+import numpy as np
+import numba
+from numba import njit, prange
+
+# Kernels are only launched from one executor thread, so the built-in workqueue
+# layer is safe; TBB hangs at exit when first driven from a worker thread.
+numba.config.THREADING_LAYER = 'workqueue'
+
+class LastValues(NamedTuple):
+    rsi: float
+    sma: float
+    ema: float
+    stoch_k: float
+    stoch_d: float
+    macd: float
+    macd_signal: float
+    bb_upper: float
+    bb_lower: float
+
+N_VALUES = len(LastValues._fields)
+
+@njit(cache=True, nogil=True)
+def _sma_last(values, period):
+    n = values.shape[0]
+    if period <= 0 or n < period:
+        return np.nan
+    total = 0.0
+    for i in range(n - period, n):
+        total += values[i]
+    return total / period
+
+@njit(cache=True, nogil=True)
+def _ema_series(values, period, start):
+    # Seeded with the SMA of `period` values ending at `start`, like TA-Lib.
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if period <= 0 or start < period - 1 or start >= n:
+        return out
+    total = 0.0
+    for i in range(start - period + 1, start + 1):
+        total += values[i]
+    prev = total / period
+    out[start] = prev
+    alpha = 2.0 / (period + 1)
+    for i in range(start + 1, n):
+        prev = alpha * values[i] + (1.0 - alpha) * prev
+        out[i] = prev
+    return out
+
+@njit(cache=True, nogil=True)
+def _ema_last(values, period):
+    if period <= 0 or values.shape[0] < period:
+        return np.nan
+    return _ema_series(values, period, period - 1)[-1]
+
+@njit(cache=True, nogil=True)
+def _rsi_last(closes, period):
+    n = closes.shape[0]
+    if period <= 0 or n <= period:
+        return np.nan
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        diff = closes[i] - closes[i - 1]
+        if diff > 0:
+            avg_gain += diff
+        else:
+            avg_loss -= diff
+    avg_gain /= period
+    avg_loss /= period
+    for i in range(period + 1, n):
+        diff = closes[i] - closes[i - 1]
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    total = avg_gain + avg_loss
+    if total == 0.0:
+        return 0.0
+    return 100.0 * avg_gain / total
+
+@njit(cache=True, nogil=True)
+def _stoch_last(closes, highs, lows, k_period, slowk_period, d_period):
+    n = closes.shape[0]
+    needed = d_period + slowk_period - 1
+    if k_period <= 0 or slowk_period <= 0 or d_period <= 0 or n < k_period + needed - 1:
+        return np.nan, np.nan
+    fast_k = np.empty(needed)
+    for j in range(needed):
+        end = n - needed + j
+        lowest = lows[end]
+        highest = highs[end]
+        for i in range(end - k_period + 1, end):
+            if lows[i] < lowest:
+                lowest = lows[i]
+            if highs[i] > highest:
+                highest = highs[i]
+        spread = highest - lowest
+        fast_k[j] = 100.0 * (closes[end] - lowest) / spread if spread > 0 else 0.0
+    slow_k = np.empty(d_period)
+    for j in range(d_period):
+        total = 0.0
+        for i in range(j, j + slowk_period):
+            total += fast_k[i]
+        slow_k[j] = total / slowk_period
+    total = 0.0
+    for j in range(d_period):
+        total += slow_k[j]
+    return slow_k[d_period - 1], total / d_period
+
+@njit(cache=True, nogil=True)
+def _macd_last(closes, fast_period, slow_period, signal_period):
+    n = closes.shape[0]
+    if fast_period > slow_period:
+        fast_period, slow_period = slow_period, fast_period
+    start = slow_period - 1
+    if fast_period <= 0 or signal_period <= 0 or n < start + signal_period:
+        return np.nan, np.nan
+    fast = _ema_series(closes, fast_period, start)
+    slow = _ema_series(closes, slow_period, start)
+    line = fast[start:] - slow[start:]
+    signal = _ema_series(line, signal_period, signal_period - 1)
+    return line[-1], signal[-1]
+
+@njit(cache=True, nogil=True)
+def _bbands_last(closes, period, deviation):
+    n = closes.shape[0]
+    if period <= 0 or n < period:
+        return np.nan, np.nan
+    mean = _sma_last(closes, period)
+    variance = 0.0
+    for i in range(n - period, n):
+        variance += (closes[i] - mean) ** 2
+    std = math.sqrt(variance / period)
+    return mean + deviation * std, mean - deviation * std
+
+@njit(cache=True, nogil=True)
+def _compute_last(closes, highs, lows, rsi_p, sma_p, ema_p, k_p, slowk_p, d_p,
+                  macd_f, macd_s, macd_sig, bb_p, bb_dev):
+    rsi = _rsi_last(closes, rsi_p)
+    sma = _sma_last(closes, sma_p)
+    ema = _ema_last(closes, ema_p)
+    stoch_k, stoch_d = _stoch_last(closes, highs, lows, k_p, slowk_p, d_p)
+    macd, macd_signal = _macd_last(closes, macd_f, macd_s, macd_sig)
+    bb_upper, bb_lower = _bbands_last(closes, bb_p, bb_dev)
+    return rsi, sma, ema, stoch_k, stoch_d, macd, macd_signal, bb_upper, bb_lower
+
+@njit(cache=True, nogil=True, parallel=True)
+def _compute_batch(closes, highs, lows, lengths, rsi_p, sma_p, ema_p, k_p, slowk_p, d_p,
+                   macd_f, macd_s, macd_sig, bb_p, bb_dev):
+    n, width = closes.shape
+    out = np.empty((n, N_VALUES))
+    for i in prange(n):
+        start = width - lengths[i]
+        values = _compute_last(closes[i, start:], highs[i, start:], lows[i, start:],
+                               rsi_p, sma_p, ema_p, k_p, slowk_p, d_p,
+                               macd_f, macd_s, macd_sig, bb_p, bb_dev)
+        for j in range(len(values)):
+            out[i, j] = values[j]
+    return out
+
+def compute_batch(series, rsi_p, sma_p, ema_p, k_p, d_p,
+                  macd_f, macd_s, macd_sig, bb_p, bb_dev, slowk_p=3) -> list:
+    if not series:
+        return []
+    lengths = np.array([len(closes) for closes, _, _ in series], dtype=np.int64)
+    width = int(lengths.max())
+    # Right-align rows so each asset is evaluated over exactly its own history.
+    mats = np.full((3, len(series), width), np.nan)
+    for i, row in enumerate(series):
+        for m, values in enumerate(row):
+            mats[m, i, width - lengths[i]:] = values
+    out = _compute_batch(mats[0], mats[1], mats[2], lengths,
+                         rsi_p, sma_p, ema_p, k_p, slowk_p, d_p,
+                         macd_f, macd_s, macd_sig, bb_p, float(bb_dev))
+    return [LastValues(*row) for row in out.tolist()]
+
+def warm_up():
+    closes = np.linspace(1.0, 2.0, 64)
+    compute_batch([(closes, closes, closes)], 14, 20, 20, 14, 3, 12, 26, 9, 50, 2)
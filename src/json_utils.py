@@ -0,0 +1,4 @@
+import orjson
+
+def response_json(response):
+    return orjson.loads(response.content)
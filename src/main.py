@@ -11,10 +11,12 @@ from datetime import datetime, timezone
 root = Path(__file__).parent
 sys.path.insert(0, str(root))
 
-from settings import EMAIL, PASSWORD, IS_DEMO, TRADE_COOLDOWN, TIMEFRAME, STRATEGY
-from assets import list_open_otc_assets, extract_price
+from settings import EMAIL, PASSWORD, IS_DEMO, TRADE_COOLDOWN, STRATEGY
+from assets import list_open_otc_assets
 from trade import execute_trades
-from indicators import calculate_indicators
+from account import get_profile, invalidate_profile
+from session import configure_http_session
+from indicators import calculate_indicators, get_latest_price, warm_up_indicators
 
 def setup_logging():
     if not logging.getLogger().hasHandlers():
@@ -37,7 +39,8 @@ logger = logging.getLogger(__name__)
 async def check_connection(client: IQOptionAPI) -> bool:
     logger.debug("Checking connection status...")
     try:
-        balance = client.getprofile().json()['result']['balance']
+        invalidate_profile()
+        balance = (await get_profile(client))['balance']
         logger.debug(f"Connection check successful. Current balance: {balance:.2f} USD")
         return True
     except Exception as e:
@@ -52,8 +55,9 @@ async def reconnect(client: IQOptionAPI, max_attempts: int = 5) -> bool:
             client.connect()
             if await check_connection(client):
                 logger.info("Reconnection successful!")
-                balance = client.getprofile().json()['result']['balance']
-                account_type = "Demo" if client.getprofile().json()['result']['is_demo'] else "Real"
+                profile = await get_profile(client)
+                balance = profile['balance']
+                account_type = "Demo" if profile['is_demo'] else "Real"
                 logger.info(f"Account balance ({account_type}): {balance:.2f} USD")
                 return True
             logger.warning(f"Reconnection attempt {attempt} failed.")
@@ -72,8 +76,12 @@ async def main():
         logger.critical("Email or password not provided in .env file. Exiting.")
         return
 
+    logger.info("Compiling indicator kernels...")
+    await warm_up_indicators()
+
     logger.info("Initializing IQ Option client...")
     client = IQOptionAPI("auth.iqoption.com", EMAIL, PASSWORD)
+    configure_http_session(client)
     client.connect()
     client.changebalance("PRACTICE" if IS_DEMO else "REAL")
 
@@ -81,8 +89,9 @@ async def main():
         logger.critical("Could not establish initial connection. Exiting.")
         return
 
-    balance = client.getprofile().json()['result']['balance']
-    account_type = "Demo" if client.getprofile().json()['result']['is_demo'] else "Real"
+    profile = await get_profile(client)
+    balance = profile['balance']
+    account_type = "Demo" if profile['is_demo'] else "Real"
     logger.info(f"Account balance ({account_type}): {balance:.2f} USD")
     logger.info("-" * 50)
 
@@ -116,13 +125,7 @@ async def main():
             else:
                 logger.debug(f"Assets for trade: {assets_for_trade}")
                 initial_indicators_log = await calculate_indicators(client, assets_for_trade)
-                initial_prices_log = {}
-                for asset in assets_for_trade:
-                    client.subscribe(asset, int(TIMEFRAME.replace('M', '')))
-                    await asyncio.sleep(1)  # Aguarda dados do WebSocket
-                    price_data = client.candles.get_realtime_candles(asset, int(TIMEFRAME.replace('M', '')))
-                    price = extract_price(list(price_data.values())[-1] if price_data else None)
-                    initial_prices_log[asset] = price if price is not None else "N/A"
+                initial_prices_log = {asset: get_latest_price(asset) or "N/A" for asset in assets_for_trade}
 
                 logger.info(f"--- Final list of assets for trade execution ({len(assets_for_trade)}) ---")
                 for asset in assets_for_trade:
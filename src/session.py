@@ -0,0 +1,19 @@
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from iqoptionapi.api import IQOptionAPI
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_CONNECTIONS = 50
+HTTP_POOL_MAXSIZE = 100
+
+def configure_http_session(client: IQOptionAPI):
+    session = getattr(client, "session", None)
+    if not isinstance(session, requests.Session):
+        logger.warning("IQOptionAPI client has no requests session; keeping default HTTP transport.")
+        return
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    logger.debug(f"HTTP session pool configured (connections={HTTP_POOL_CONNECTIONS}, maxsize={HTTP_POOL_MAXSIZE}).")
@@ -8,16 +8,17 @@ from settings import (
     TRADE_ENABLED, TRADE_PERCENTAGE, TRADE_PERCENTAGE_MIN, TRADE_PERCENTAGE_MAX,
     TRADE_DURATION, RSI_BUY_THRESHOLD, RSI_SELL_THRESHOLD, TRADE_COOLDOWN,
     DAILY_LOSS_LIMIT, CONSECUTIVE_LOSSES_THRESHOLD, CONSECUTIVE_WINS_THRESHOLD,
-    MACD_INDICATOR, STRATEGY, TIMEFRAME, STOCHASTIC_BUY_THRESHOLD, STOCHASTIC_SELL_THRESHOLD
+    MACD_INDICATOR, STRATEGY, STOCHASTIC_BUY_THRESHOLD, STOCHASTIC_SELL_THRESHOLD
 )
-from assets import extract_price
-from indicators import calculate_indicators
+from indicators import calculate_indicators, get_latest_price
+from account import get_profile, invalidate_profile
 
 logger = logging.getLogger(__name__)
 
 class TradingState:
     def __init__(self):
-        self.open_orders = []
+        self.open_orders = {}
+        self.open_assets = set()
         self.last_trade_time = {}
         self.daily_loss = 0.0
         self.initial_daily_balance = 0.0
@@ -36,15 +37,16 @@ class TradingState:
         logger.info(f"Daily reset: Initial balance {self.initial_daily_balance:.2f} USD.")
 
     def add_order(self, order_details: dict):
-        self.open_orders.append(order_details)
+        self.open_orders[order_details['id']] = order_details
+        self.open_assets.add(order_details['asset'])
         logger.debug(f"Added order {order_details.get('id')}.")
 
     def remove_order(self, order: dict):
-        try:
-            self.open_orders.remove(order)
-            logger.debug(f"Removed order ID {order.get('id')}.")
-        except ValueError:
+        if self.open_orders.pop(order.get('id'), None) is None:
             logger.warning(f"Failed to remove order ID {order.get('id')}.")
+            return
+        self.open_assets.discard(order.get('asset'))
+        logger.debug(f"Removed order ID {order.get('id')}.")
 
     def update_trade_time(self, asset: str, current_time: int):
         self.last_trade_time[asset] = current_time
@@ -81,6 +83,52 @@ class TradingState:
 
 trading_state = TradingState()
 
+SIGNALS_LOG_FILE = "signals_log.csv"
+SIGNALS_LOG_HEADER = ["Timestamp", "Asset", "Price", "RSI", "SMA", "Stoch_K", "Stoch_D", "MACD", "MACD_Signal", "Strategy", "Decision", "Result"]
+SIGNALS_LOG_BATCH = 50
+SIGNAL_QUEUE = asyncio.Queue(maxsize=1000)
+_signal_writer_task = None
+
+def _drain_signal_queue(limit: int = None) -> list:
+    rows = []
+    while limit is None or len(rows) < limit:
+        try:
+            rows.append(SIGNAL_QUEUE.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return rows
+
+async def _signal_writer():
+    with open(SIGNALS_LOG_FILE, "a", newline="") as f:
+        w = csv.writer(f)
+        if f.tell() == 0:
+            w.writerow(SIGNALS_LOG_HEADER)
+        try:
+            while True:
+                batch = [await SIGNAL_QUEUE.get()]
+                batch.extend(_drain_signal_queue(SIGNALS_LOG_BATCH - 1))
+                w.writerows(batch)
+                f.flush()
+        finally:
+            pending = _drain_signal_queue()
+            if pending:
+                w.writerows(pending)
+                f.flush()
+
+def _on_signal_writer_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Signal log writer stopped: {task.exception()}")
+
+def log_signal(row: list):
+    global _signal_writer_task
+    if _signal_writer_task is None or _signal_writer_task.done():
+        _signal_writer_task = asyncio.create_task(_signal_writer())
+        _signal_writer_task.add_done_callback(_on_signal_writer_done)
+    try:
+        SIGNAL_QUEUE.put_nowait(row)
+    except asyncio.QueueFull:
+        logger.warning(f"Signal log queue full; dropping row for {row[1]}")
+
 def is_trade_signal_trend(indicators, price):
     rsi = indicators.get("RSI")
     sma = indicators.get("SMA")
@@ -140,6 +188,38 @@ def get_signal_for_strategy(strategy, indicators, price):
     logger.warning(f"Unknown strategy: {strategy}")
     return None
 
+def _reconcile_order(order: dict, current_indicators: dict, orders_by_id: dict):
+    try:
+        asset = order['asset']
+        bb_upper = current_indicators.get(asset, {}).get("BB_upper")
+        bb_lower = current_indicators.get(asset, {}).get("BB_lower")
+        current_price = get_latest_price(asset)
+        if not current_price or bb_upper is None or bb_lower is None:
+            return order, False
+        remove = False
+        direction = order['direction']
+        if direction == "call" and current_price < bb_lower:
+            logger.info(f"[{asset}] Trailing stop hit: Closing call at {current_price}")
+            trading_state.update_loss(order['amount'])
+            remove = True
+        elif direction == "put" and current_price > bb_upper:
+            logger.info(f"[{asset}] Trailing stop hit: Closing put at {current_price}")
+            trading_state.update_loss(order['amount'])
+            remove = True
+        # Note: IQOptionAPI não tem check_win direto; usar histórico de ordens
+        order_info = orders_by_id.get(order['id'])
+        if order_info and order_info['status'] == 'closed':
+            profit = order_info['profit'] if 'profit' in order_info else 0
+            if profit > 0:
+                trading_state.update_win(profit)
+            else:
+                trading_state.update_loss(order['amount'])
+            remove = True
+        return order, remove
+    except Exception as e:
+        logger.warning(f"Error checking order {order.get('id')}: {e}")
+        return order, True
+
 async def execute_trades(client: IQOptionAPI, assets: list, indicators: dict):
     if not TRADE_ENABLED or not assets:
         logger.debug("Trade execution skipped: TRADE_ENABLED is False or no assets.")
@@ -147,52 +227,29 @@ async def execute_trades(client: IQOptionAPI, assets: list, indicators: dict):
 
     now = int(time.time())
     if trading_state.last_reset_time is None or (now - trading_state.last_reset_time) >= 86400:
-        balance = client.getprofile().json()['result']['balance']
+        balance = (await get_profile(client))['balance']
         trading_state.reset_daily(balance, now)
 
     to_remove = []
-    for order in trading_state.open_orders:
+    if trading_state.open_orders:
         try:
-            asset = order['asset']
-            current_indicators = await calculate_indicators(client, [asset])
-            bb_upper = current_indicators.get(asset, {}).get("BB_upper")
-            bb_lower = current_indicators.get(asset, {}).get("BB_lower")
-            client.subscribe(asset, int(TIMEFRAME.replace('M', '')))
-            await asyncio.sleep(1)
-            price_data = client.candles.get_realtime_candles(asset, int(TIMEFRAME.replace('M', '')))
-            current_price = extract_price(list(price_data.values())[-1] if price_data else None)
-            if not current_price or bb_upper is None or bb_lower is None:
-                continue
-            direction = order['direction']
-            open_price = order.get('open_price', current_price)
-            if direction == "call" and current_price < bb_lower:
-                logger.info(f"[{asset}] Trailing stop hit: Closing call at {current_price}")
-                trading_state.update_loss(order['amount'])
-                to_remove.append(order)
-            elif direction == "put" and current_price > bb_upper:
-                logger.info(f"[{asset}] Trailing stop hit: Closing put at {current_price}")
-                trading_state.update_loss(order['amount'])
-                to_remove.append(order)
-            # Note: IQOptionAPI não tem check_win direto; usar histórico de ordens
-            order_status = client.getprofile().json()['result']['orders']
-            order_info = next((o for o in order_status if o['id'] == order['id']), None)
-            if order_info and order_info['status'] == 'closed':
-                profit = order_info['profit'] if 'profit' in order_info else 0
-                if profit > 0:
-                    trading_state.update_win(profit)
-                else:
-                    trading_state.update_loss(order['amount'])
-                to_remove.append(order)
+            order_assets = list(dict.fromkeys(o['asset'] for o in trading_state.open_orders.values()))
+            current_indicators = await calculate_indicators(client, order_assets)
+            orders_by_id = {o['id']: o for o in (await get_profile(client))['orders']}
         except Exception as e:
-            logger.warning(f"Error checking order {order.get('id')}: {e}")
-            to_remove.append(order)
+            logger.warning(f"Error fetching data for open orders: {e}")
+        else:
+            results = [
+                _reconcile_order(order, current_indicators, orders_by_id) for order in list(trading_state.open_orders.values())
+            ]
+            to_remove = [order for order, remove in results if remove]
     for o in to_remove:
         trading_state.remove_order(o)
 
     trading_state.adjust_trade_percentage()
 
     for asset in assets:
-        if any(o['asset'] == asset for o in trading_state.open_orders):
+        if asset in trading_state.open_assets:
             logger.debug(f"[{asset}] Skipping: Already has an open order")
             continue
         if now - trading_state.last_trade_time.get(asset, 0) < TRADE_COOLDOWN:
@@ -200,32 +257,25 @@ async def execute_trades(client: IQOptionAPI, assets: list, indicators: dict):
             continue
 
         data = indicators.get(asset, {})
-        client.subscribe(asset, int(TIMEFRAME.replace('M', '')))
-        await asyncio.sleep(1)
-        price_data = client.candles.get_realtime_candles(asset, int(TIMEFRAME.replace('M', '')))
-        price = extract_price(list(price_data.values())[-1] if price_data else None)
+        price = get_latest_price(asset)
         if price is None:
             logger.debug(f"[{asset}] Skipped – missing price")
             continue
 
         direction = get_signal_for_strategy(STRATEGY, data, price)
-        with open("signals_log.csv", "a", newline="") as f:
-            w = csv.writer(f)
-            if f.tell() == 0:
-                w.writerow(["Timestamp", "Asset", "Price", "RSI", "SMA", "Stoch_K", "Stoch_D", "MACD", "MACD_Signal", "Strategy", "Decision", "Result"])
-            w.writerow([
-                datetime.now().isoformat(), asset, price,
-                data.get("RSI"), data.get("SMA"),
-                data.get("STOCHASTIC", {}).get("k"), data.get("STOCHASTIC", {}).get("d"),
-                data.get("MACD", {}).get("macd"), data.get("MACD", {}).get("signal"),
-                STRATEGY, direction or "ignored", None
-            ])
+        log_signal([
+            datetime.now().isoformat(), asset, price,
+            data.get("RSI"), data.get("SMA"),
+            data.get("STOCHASTIC", {}).get("k"), data.get("STOCHASTIC", {}).get("d"),
+            data.get("MACD", {}).get("macd"), data.get("MACD", {}).get("signal"),
+            STRATEGY, direction or "ignored", None
+        ])
 
         if not direction:
             logger.debug(f"[{asset}] No signal for '{STRATEGY}'")
             continue
 
-        balance = client.getprofile().json()['result']['balance']
+        balance = (await get_profile(client))['balance']
         amount = round((trading_state.current_trade_percentage / 100) * balance, 2)
         amount = max(1.0, min(5000.0, amount))
 
@@ -234,8 +284,10 @@ async def execute_trades(client: IQOptionAPI, assets: list, indicators: dict):
             continue
 
         try:
-            check, order_id = client.buy(amount, asset, direction, TRADE_DURATION)
+            loop = asyncio.get_running_loop()
+            check, order_id = await loop.run_in_executor(None, client.buy, amount, asset, direction, TRADE_DURATION)
             if check and order_id:
+                invalidate_profile()
                 trading_state.add_order({
                     'id': order_id, 'asset': asset, 'direction': direction,
                     'amount': amount, 'open_price': price